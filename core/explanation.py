@@ -5,6 +5,8 @@ Generates human-readable explanations for a diagnosis.
 Answers: WHY was this disease diagnosed?
 """
 
+import io
+
 from core.inference_engine import DiagnosisResult
 
 
@@ -17,33 +19,37 @@ class ExplanationModule:
     def __init__(self, result: DiagnosisResult, all_symptoms: list):
         self.result = result
         self.all_symptoms = all_symptoms  # all symptoms the patient reported
+        self._matched_text = ", ".join(result.matched_symptoms)
 
     def get_full_explanation(self) -> str:
         r = self.result
-        lines = []
-
-        lines.append(f"DIAGNOSIS: {r.display_name}")
-        lines.append(f"Confidence: {r.confidence}%")
-        lines.append(f"Severity  : {r.severity.upper()}")
-        lines.append("")
-        lines.append(f"Description: {r.description}")
-        lines.append("")
-        lines.append("WHY THIS DIAGNOSIS?")
-        lines.append(f"  {len(r.fired_rules)} rule(s) fired for this disease.")
-        lines.append("")
-
-        for i, rule in enumerate(r.fired_rules, 1):
-            lines.append(f"  Rule {i}: [{rule.rule_id}]")
-            lines.append(f"    Matched symptoms : {', '.join(rule.matched_conditions)}")
-            lines.append(f"    Reasoning        : {rule.explanation}")
-            lines.append(f"    Confidence added : +{rule.confidence_boost}")
-            lines.append("")
-
-        lines.append(f"Key symptoms that contributed: {', '.join(r.matched_symptoms)}")
-        lines.append("")
-        lines.append(f"RECOMMENDED ACTION: {r.recommended_action}")
-
-        return "\n".join(lines)
+        buf = io.StringIO()
+        w = buf.write
+
+        w(f"DIAGNOSIS: {r.display_name}\n")
+        w(f"Confidence: {r.confidence}%\n")
+        w(f"Severity  : {r.severity.upper()}\n")
+        w("\n")
+        w(f"Description: {r.description}\n")
+        w("\n")
+        w("WHY THIS DIAGNOSIS?\n")
+        fired = r.fired_rules
+        w(f"  {len(fired)} rule(s) fired for this disease.\n")
+        w("\n")
+
+        join = ", ".join
+        for i, rule in enumerate(fired, 1):
+            w(f"  Rule {i}: [{rule.rule_id}]\n"
+              f"    Matched symptoms : {join(rule.matched_conditions)}\n"
+              f"    Reasoning        : {rule.explanation}\n"
+              f"    Confidence added : +{rule.confidence_boost}\n"
+              "\n")
+
+        w(f"Key symptoms that contributed: {self._matched_text}\n")
+        w("\n")
+        w(f"RECOMMENDED ACTION: {r.recommended_action}")
+
+        return buf.getvalue()
 
     def get_short_explanation(self) -> str:
         """One-liner explanation for quick display."""
@@ -51,5 +57,5 @@ class ExplanationModule:
         return (
             f"{self.result.display_name} diagnosed with {self.result.confidence}% confidence "
             f"based on rules {', '.join(rule_ids)} "
-            f"matching symptoms: {', '.join(self.result.matched_symptoms)}."
+            f"matching symptoms: {self._matched_text}."
         )
\ No newline at end of file
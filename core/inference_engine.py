@@ -15,38 +15,71 @@ Forward Chaining:
   Start with FACTS (symptoms) -> match RULES -> conclude DISEASES
 """
 
-import json
+import heapq
 import os
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 
-from core.knowledge_base import KnowledgeBase, Rule
+try:                                # optional, faster JSON decoder
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+from core.knowledge_base import DISEASE_IDS, SEVERITY_PRIORITY, KnowledgeBase, Rule
 from core.working_memory import WorkingMemory
 
 
+# ── Severity ranking ─────────────────────────
+
+_SEVERITY_BY_PRIORITY = {v: k for k, v in SEVERITY_PRIORITY.items()}
+
+
 # ── Load disease metadata ────────────────────
 
-def _load_disease_data() -> dict:
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    path = os.path.join(base_dir, "data", "diseases.json")
-    with open(path) as f:
-        return json.load(f)
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISEASES_PATH = os.path.join(_BASE_DIR, "data", "diseases.json")
+
+
+@lru_cache(maxsize=1)
+def load_disease_data() -> dict:
+    """Parsed once per process and shared by every engine (read-only)."""
+    with open(DISEASES_PATH, "rb") as f:
+        return _json_loads(f.read())
+
+
+# ── Compiled Matcher ─────────────────────────
+
+@lru_cache(maxsize=8)
+def _compile_matcher(rule_masks: tuple):
+    """
+    Generate a matcher specialized for one set of rule masks: every rule
+    becomes a straight-line `if` with its mask inlined as a constant.
+    The returned function maps wm_mask -> fired rule positions (KB order).
+    """
+    lines = ["def _matcher(wm_mask):", "    fired = []"]
+    for pos, mask in enumerate(rule_masks):
+        lines.append(f"    if (wm_mask & {mask}) == {mask}: fired.append({pos})")
+    lines.append("    return fired")
+    namespace = {}
+    exec(compile("\n".join(lines), "<knowledge-base>", "exec"), namespace)
+    return namespace["_matcher"]
 
 
 # ── Result Dataclasses ───────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class FiredRule:
     """A rule that fired during inference."""
     rule_id: str
     disease: str
-    matched_conditions: list
+    matched_conditions: tuple
     confidence_boost: float
     severity: str
     explanation: str
 
 
-@dataclass
+@dataclass(slots=True)
 class DiagnosisResult:
     """A single disease diagnosis with confidence and metadata."""
     disease: str
@@ -73,39 +106,83 @@ class InferenceEngine:
     def __init__(self, kb: KnowledgeBase, wm: WorkingMemory):
         self.kb = kb
         self.wm = wm
-        self.disease_data = _load_disease_data()
+        self.disease_data = load_disease_data()
         self._fired_rules = []
-        self._confidence_map = defaultdict(float)
+        self._fired_by_disease = defaultdict(list)
+        self._max_severity = []                     # severity priority by disease id
+        self._confidence = []                       # raw score by disease id (ints)
         self._matched_symptoms_map = defaultdict(set)
+        self._last_results = None
+        self._wm_fingerprint = None
+        self._matcher = None                        # (kb.version, fn) once compiled
+
+    def compile(self):
+        """
+        Specialize rule matching for the current knowledge base.
+        Worth it when one KB serves many patients; recompiles automatically
+        if rules are added later.
+        """
+        self._matcher = (self.kb.version, _compile_matcher(tuple(self.kb.rule_masks)))
+        return self
 
     def run(self) -> list:
         """
         Run forward chaining inference.
         Returns list of DiagnosisResult sorted by confidence (highest first).
+        Re-running with unchanged symptoms and rules returns the cached results.
+        The cache is keyed on the live symptom set and the KB's version, so
+        direct edits to `wm.symptoms` are picked up like add_symptom().
         """
-        # Reset state
-        self._fired_rules.clear()
-        self._confidence_map.clear()
-        self._matched_symptoms_map.clear()
+        if self.wm.is_empty():
+            # Nothing to match: skip the fingerprint and rule walk entirely
+            self._reset()
+            return []
 
-        # Step 1: Match every rule against working memory
-        for rule in self.kb.get_all_rules():
-            if self._rule_matches(rule):
-                self._fire_rule(rule)
+        fingerprint = self._fingerprint()
+        if fingerprint == self._wm_fingerprint:
+            return list(self._last_results)     # callers may mutate their copy
 
-        # Step 2: If nothing fired, return empty
-        if not self._confidence_map:
-            return []
+        self._match()
 
-        # Step 3: Build and sort results
-        results = self._build_results()
-        results.sort(key=lambda x: x.confidence, reverse=True)
+        # If nothing fired, return empty; otherwise build and sort results
+        results = []
+        if self._fired_rules:
+            percentages = self._percentages()
+            ranked = sorted(self._fired_by_disease, key=self._rank_key, reverse=True)
+            results = [self._build_result(d, percentages) for d in ranked]
 
+        self._last_results = tuple(results)
+        self._wm_fingerprint = fingerprint
         return results
 
-    def _rule_matches(self, rule: Rule) -> bool:
-        """Check if ALL conditions of a rule exist in working memory."""
-        return all(self.wm.has_symptom(cond) for cond in rule.conditions)
+    def _fingerprint(self) -> tuple:
+        # Symptoms outside every rule can't change the results, so the
+        # working-memory bitmask identifies a diagnosis completely
+        return self.wm.mask, self.kb.version
+
+    def _reset(self):
+        """Forget the previous run's fired rules and cached results."""
+        self._wm_fingerprint = None
+        self._fired_rules.clear()
+        self._fired_by_disease.clear()
+        self._max_severity = [0] * len(DISEASE_IDS)
+        self._confidence = [0] * len(DISEASE_IDS)
+        self._matched_symptoms_map.clear()
+
+    def _match(self):
+        """Reset state, then fire every rule whose conditions all hold."""
+        self._reset()
+
+        # Compiled bitmask matcher if requested, else the KB's condition trie
+        rules = self.kb.get_all_rules()
+        if self._matcher is not None:
+            if self._matcher[0] != self.kb.version:
+                self.compile()
+            fired_positions = self._matcher[1](self.wm.mask)
+        else:
+            fired_positions = self.kb.matching_positions(self.wm.symptoms)
+        for pos in fired_positions:
+            self._fire_rule(rules[pos])
 
     def _fire_rule(self, rule: Rule):
         """Fire a rule — log it and accumulate confidence."""
@@ -118,51 +195,74 @@ class InferenceEngine:
             explanation=rule.explanation
         )
         self._fired_rules.append(fired)
-        self._confidence_map[rule.disease] += rule.confidence_boost
-        for symptom in rule.conditions:
-            self._matched_symptoms_map[rule.disease].add(symptom)
+        self._fired_by_disease[rule.disease].append(fired)
+        did = rule.disease_id
+        if rule.severity_level > self._max_severity[did]:
+            self._max_severity[did] = rule.severity_level
+        self._confidence[did] += rule.confidence_boost
+        self._matched_symptoms_map[rule.disease].update(rule.conditions_fs)
 
-    def _build_results(self) -> list:
-        """Convert confidence map into DiagnosisResult objects."""
-        total_confidence = sum(self._confidence_map.values())
-        results = []
-        diseases_info = self.disease_data["diseases"]
-
-        for disease, raw_confidence in self._confidence_map.items():
-            confidence_pct = round((raw_confidence / total_confidence) * 100, 1)
-            confidence_pct = min(confidence_pct, 85.0)  # cap at 85% — more realistic
-            info = diseases_info.get(disease, {})
-            disease_fired_rules = [fr for fr in self._fired_rules if fr.disease == disease]
-            severity = self._resolve_severity(disease_fired_rules, info.get("severity", "low"))
-
-            result = DiagnosisResult(
-                disease=disease,
-                display_name=info.get("display_name", disease),
-                confidence=confidence_pct,
-                severity=severity,
-                recommended_action=info.get("recommended_action", "Consult a doctor."),
-                fired_rules=disease_fired_rules,
-                matched_symptoms=sorted(list(self._matched_symptoms_map[disease])),
-                description=info.get("description", "")
-            )
-            results.append(result)
+    def _percentages(self) -> list:
+        """
+        Normalize every disease in one pass, in whole tenths of a percent:
+        leftover tenths go to the largest remainders so the shares sum to
+        exactly 100.0. Then cap at 85% — more realistic.
+        """
+        raw = self._confidence
+        total = sum(raw)
+        tenths, remainders = [], []
+        for score in raw:
+            q, rem = divmod(score * 1000, total)
+            tenths.append(int(q))
+            remainders.append(rem)
+        leftover = 1000 - sum(tenths)
+        for did in sorted(range(len(raw)), key=remainders.__getitem__, reverse=True)[:leftover]:
+            tenths[did] += 1
+        return [min(t / 10, 85.0) for t in tenths]
 
-        return results
+    def _rank_key(self, disease: str):
+        # Rank on the exact raw score, so rounding can never reorder diseases
+        return self._confidence[DISEASE_IDS[disease]]
+
+    def _build_result(self, disease: str, percentages: list) -> DiagnosisResult:
+        """Convert one disease's accumulated confidence into a DiagnosisResult."""
+        info = self.disease_data["diseases"].get(disease, {})
+        return DiagnosisResult(
+            disease=disease,
+            display_name=info.get("display_name", disease),
+            confidence=percentages[DISEASE_IDS[disease]],
+            severity=self._resolve_severity(disease, info.get("severity", "low")),
+            recommended_action=info.get("recommended_action", "Consult a doctor."),
+            fired_rules=self._fired_by_disease[disease],
+            matched_symptoms=sorted(self._matched_symptoms_map[disease]),
+            description=info.get("description", "")
+        )
 
-    def _resolve_severity(self, fired_rules: list, default: str) -> str:
-        """Use highest severity among all fired rules for this disease."""
-        priority = {"low": 1, "medium": 2, "high": 3, "critical": 4}
-        max_severity = default
-        for rule in fired_rules:
-            if priority.get(rule.severity, 0) > priority.get(max_severity, 0):
-                max_severity = rule.severity
-        return max_severity
+    def _resolve_severity(self, disease: str, default: str) -> str:
+        """Use highest severity among the disease default and its fired rules."""
+        level = self._max_severity[DISEASE_IDS[disease]]
+        if level > SEVERITY_PRIORITY.get(default, 0):
+            return _SEVERITY_BY_PRIORITY[level]
+        return default
 
     def get_fired_rules(self) -> list:
         """Return all rules that fired in the last run."""
         return self._fired_rules
 
+    def get_top_diagnoses(self, k: int) -> list:
+        """
+        Returns the k best diagnoses, in the same order run() would.
+        Without cached results, only those k DiagnosisResults are built.
+        """
+        if self._fingerprint() == self._wm_fingerprint:
+            return list(self._last_results[:k])
+        self._match()
+        percentages = self._percentages() if self._fired_rules else []
+        # nlargest is stable, so ties keep first-fired order like run()
+        top = heapq.nlargest(k, self._fired_by_disease, key=self._rank_key)
+        return [self._build_result(d, percentages) for d in top]
+
     def get_top_diagnosis(self):
         """Returns only the top diagnosis."""
-        results = self.run()
-        return results[0] if results else None
\ No newline at end of file
+        results = self.get_top_diagnoses(1)
+        return results[0] if results else None
@@ -18,30 +18,133 @@ Rule design:
   - The inference engine ranks diseases by total accumulated confidence.
 """
 
-from dataclasses import dataclass
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
+from sys import intern
+
+
+# ── Severity ranking ─────────────────────────
+
+class Severity(IntEnum):
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+
+
+SEVERITY_PRIORITY = {s.name.lower(): s for s in Severity}
+
+
+# ── Disease ids ──────────────────────────────
+# Process-wide and append-only, so ids agree across KnowledgeBase instances.
+
+DISEASE_IDS: dict = {}
+
+
+# ── Symptom bits ─────────────────────────────
+# Process-wide and append-only: every symptom named by a rule owns one bit,
+# so any symptom set encodes to a single int and matching is an AND.
+
+SYMPTOM_BITS: dict = {}
+
+
+def symptom_mask(symptoms) -> int:
+    """Encode symptoms as an int bitmask. Unknown symptoms are ignored."""
+    mask = 0
+    for s in symptoms:
+        mask |= SYMPTOM_BITS.get(s, 0)
+    return mask
 
 
 # ── Rule Dataclass ───────────────────────────
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Rule:
     """
-    Represents a single IF-THEN diagnostic rule.
+    Represents a single IF-THEN diagnostic rule. Immutable once built.
 
     Attributes:
         rule_id         : Unique identifier (e.g., "R01")
-        conditions      : List of symptoms that must ALL be present
+        conditions      : Symptoms that must ALL be present (stored as a tuple)
         disease         : Disease this rule supports
         confidence_boost: How much confidence (0–100 scale) this rule adds
         severity        : Severity level if this rule fires (low/medium/high/critical)
         explanation     : Human-readable explanation of why this rule fires
+        severity_level  : `severity` as a Severity (derived, 0 if unknown)
+        conditions_fs   : `conditions` as a frozenset (derived)
+        disease_id      : Dense integer id of `disease` (derived)
+        cond_mask       : `conditions` as a SYMPTOM_BITS bitmask (derived)
     """
     rule_id: str
-    conditions: list
+    conditions: tuple
     disease: str
     confidence_boost: float
     severity: str
     explanation: str
+    severity_level: int = field(init=False, repr=False, compare=False)
+    conditions_fs: frozenset = field(init=False, repr=False, compare=False)
+    disease_id: int = field(init=False, repr=False, compare=False)
+    cond_mask: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Frozen: derived fields are set once here, bypassing __setattr__
+        init = object.__setattr__
+        # Interned, so hash probes against interned facts hit on identity
+        init(self, "conditions", tuple(map(intern, self.conditions)))
+        init(self, "disease", intern(self.disease))
+        init(self, "severity", intern(self.severity))
+        init(self, "severity_level", SEVERITY_PRIORITY.get(self.severity, 0))
+        init(self, "conditions_fs", frozenset(self.conditions))
+        init(self, "disease_id", DISEASE_IDS.setdefault(self.disease, len(DISEASE_IDS)))
+        mask = 0
+        for cond in self.conditions:
+            bit = SYMPTOM_BITS.get(cond)
+            if bit is None:
+                bit = SYMPTOM_BITS[cond] = 1 << len(SYMPTOM_BITS)
+            mask |= bit
+        init(self, "cond_mask", mask)
+
+
+# ── Scoring kernel ───────────────────────────
+
+def _score_kernel(cond_masks, boosts, disease_ids, facts_mask, out):
+    """Add each satisfied rule's boost into `out[disease_id]`."""
+    for mask, boost, did in zip(cond_masks, boosts, disease_ids):
+        if mask & facts_mask == mask:
+            out[did] += boost
+
+
+_SCORE_CACHE_SIZE = 4096      # distinct facts masks memoized per KB
+
+
+# ── Rule merging ─────────────────────────────
+
+def _merge_duplicates(rules) -> list:
+    """
+    Collapses rules with the same disease and the same condition set
+    into one synthetic rule (boosts summed, highest severity kept), so
+    every diagnosis scores exactly as before with fewer rules to match.
+    """
+    merged = {}
+    for rule in rules:
+        key = (rule.disease, rule.conditions_fs)
+        first = merged.get(key)
+        if first is None:
+            merged[key] = rule
+            continue
+        worst = rule if rule.severity_level > first.severity_level else first
+        merged[key] = Rule(
+            rule_id=f"{first.rule_id}+{rule.rule_id}",
+            conditions=first.conditions,
+            disease=first.disease,
+            confidence_boost=first.confidence_boost + rule.confidence_boost,
+            severity=worst.severity,
+            explanation=f"{first.explanation} {rule.explanation}"
+        )
+    return list(merged.values())
 
 
 # ── KnowledgeBase Class ──────────────────────
@@ -52,660 +155,861 @@ class KnowledgeBase:
     Acts as the long-term memory of the expert system.
     """
 
-    def __init__(self):
-        self.rules: list[Rule] = []
-        self._load_rules()
+    def __init__(self, frozen: bool = False):
+        # A frozen KB shares the module's rule tuple; otherwise it gets its
+        # own list so add_rule() cannot leak into other instances. Kept
+        # private: every change must go through add_rule/add_rules/compile
+        # so the indexes and `version` stay in step with it.
+        self._rules = _RULES if frozen else list(_RULES)
+        self.frozen = frozen
+        self.version = 0              # bumped on every mutation
+        self._rule_masks: list = None
+        self._score_masks: list = None
+        self._rule_boosts: array = None
+        self._rule_disease_ids: list = None
+        self._single_boosts: dict = None
+        self._rules_by_pivot: dict = None
+        self._rules_by_disease: dict = None
+        self._rule_counts: Counter = None
+        self._rule_trie: tuple = None
+        self._explanations: dict = None
+        self._all_rules: tuple = None
+        self._score_cache: dict = {}  # facts_mask -> score tuple
+
+    @property
+    def rules(self) -> tuple[Rule, ...]:
+        """All rules, read-only; use add_rule()/add_rules() to change them."""
+        return self.get_all_rules()
+
+    def _check_mutable(self):
+        if self.frozen:
+            raise RuntimeError("The shared KnowledgeBase is read-only; "
+                               "create KnowledgeBase() to add rules.")
 
     def add_rule(self, rule: Rule):
-        self.rules.append(rule)
+        self._check_mutable()
+        self._rules.append(rule)
+        self.version += 1
+        self._rule_masks = None       # indexes must be rebuilt
+
+    def add_rules(self, rules):
+        """Add several rules at once; indexes are invalidated only once."""
+        self._check_mutable()
+        self._rules.extend(rules)
+        self.version += 1
+        self._rule_masks = None
+
+    # ── Rule Indexes ─────────────────────────────
+
+    def _ensure_indexes(self):
+        """
+        Keeps every rule's mask parallel to `self.rules`, groups rules by
+        disease, and indexes every rule under its rarest condition only —
+        it cannot fire without it, so candidate sets stay small.
 
-    def get_all_rules(self) -> list[Rule]:
-        return self.rules
+        Also builds a condition trie: each rule is inserted along its
+        conditions sorted rarest-first, so a walk over the facts prunes a
+        whole subtree as soon as its gating symptom is absent. A node is
+        `(children: {symptom: node}, positions of rules ending here)`.
+        """
+        if self._rule_masks is not None:
+            return
+        self._score_cache.clear()
+        self._score_masks = None          # score() rebuilds its columns lazily
+        freq = {}
+        for rule in self._rules:
+            for cond in rule.conditions:
+                freq[cond] = freq.get(cond, 0) + 1
+        by_pivot = {}
+        for pos, rule in enumerate(self._rules):
+            if rule.conditions:
+                pivot = min(rule.conditions, key=freq.__getitem__)
+                by_pivot.setdefault(pivot, []).append(pos)
+        self._rules_by_pivot = by_pivot
+        rarity = lambda cond: (freq[cond], cond)
+        trie = ({}, [])
+        for pos, rule in enumerate(self._rules):
+            node = trie
+            for cond in sorted(rule.conditions, key=rarity):
+                node = node[0].setdefault(cond, ({}, []))
+            node[1].append(pos)
+        self._rule_trie = trie
+        by_disease = {}
+        for rule in self._rules:
+            by_disease.setdefault(rule.disease, []).append(rule)
+        self._rules_by_disease = {d: tuple(rs) for d, rs in by_disease.items()}
+        self._rule_counts = Counter(rule.disease for rule in self._rules)
+        self._explanations = {rule.rule_id: rule.explanation for rule in self._rules}
+        self._all_rules = tuple(self._rules)
+        self._rule_masks = [rule.cond_mask for rule in self._rules]
+
+    def _ensure_score_columns(self):
+        """
+        Lays the multi-condition rules out column-wise (condition bitmask,
+        boost and disease id) for score(), and files single-condition rules
+        in a flat {symptom bit: [(disease id, boost)]} table since they need
+        no subset test at all. Built on the first score() call only.
+        """
+        self._ensure_indexes()
+        if self._score_masks is not None:
+            return
+        singles = {}
+        multi = []
+        for rule in self._rules:
+            if len(rule.conditions) == 1:
+                singles.setdefault(rule.cond_mask, []).append(
+                    (rule.disease_id, rule.confidence_boost))
+            else:
+                multi.append(rule)
+        self._single_boosts = singles
+        boosts = [rule.confidence_boost for rule in multi]
+        # Every shipped boost is a small whole number: store them as int8
+        # and let score() accumulate exact ints, converting once at the end
+        if all(b == int(b) and -128 <= b < 128 for b in boosts):
+            self._rule_boosts = array("b", map(int, boosts))
+        else:
+            self._rule_boosts = array("d", boosts)
+        self._rule_disease_ids = [rule.disease_id for rule in multi]
+        self._score_masks = [rule.cond_mask for rule in multi]
 
-    def get_rules_for_disease(self, disease: str) -> list[Rule]:
-        return [r for r in self.rules if r.disease == disease]
+    @property
+    def rule_masks(self) -> list:
+        """Condition bitmask of each rule, parallel to `self.rules`."""
+        self._ensure_indexes()
+        return self._rule_masks
 
-    def _load_rules(self):
+    def score(self, facts_mask: int) -> tuple[float, ...]:
         """
-        Encodes all medical diagnostic rules.
-        Rules based on WHO fever guidelines and standard medical references.
-
-        Confidence boost scale:
-          5  → weak signal (common symptom, low specificity)
-          10 → moderate signal
-          15 → strong signal (more specific to this disease)
-          20 → very strong / near-pathognomonic signal
+        Raw confidence per disease id for a symptom bitmask, without
+        building any per-rule records. Memoized per mask: UIs send the
+        same few checkbox combinations over and over.
         """
+        self._ensure_score_columns()
+        cached = self._score_cache.get(facts_mask)
+        if cached is not None:
+            return cached
+        out = [0] * len(DISEASE_IDS)
+        _score_kernel(self._score_masks, self._rule_boosts,
+                      self._rule_disease_ids, facts_mask, out)
+        singles = self._single_boosts
+        mask = facts_mask
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            for did, boost in singles.get(bit, ()):
+                out[did] += boost
+        if len(self._score_cache) >= _SCORE_CACHE_SIZE:
+            self._score_cache.clear()
+        result = self._score_cache[facts_mask] = tuple(map(float, out))
+        return result
 
-        rules = [
-
-            # ── COMMON FLU RULES ─────────────────
-
-            Rule(
-                rule_id="R01",
-                conditions=["low_grade_fever", "cough", "sore_throat"],
-                disease="common_flu",
-                confidence_boost=15,
-                severity="low",
-                explanation="Classic triad of flu: low-grade fever + cough + sore throat strongly suggests influenza."
-            ),
-            Rule(
-                rule_id="R02",
-                conditions=["moderate_fever", "runny_nose", "sneezing"],
-                disease="common_flu",
-                confidence_boost=12,
-                severity="low",
-                explanation="Runny nose and sneezing with fever are hallmark upper respiratory flu symptoms."
-            ),
-            Rule(
-                rule_id="R03",
-                conditions=["moderate_fever", "body_ache", "fatigue"],
-                disease="common_flu",
-                confidence_boost=12,
-                severity="low",
-                explanation="Moderate fever with body ache and fatigue is a common flu presentation."
-            ),
-            Rule(
-                rule_id="R04",
-                conditions=["moderate_fever", "chills", "headache", "body_ache"],
-                disease="common_flu",
-                confidence_boost=14,
-                severity="low",
-                explanation="Chills + headache + body ache with fever is a typical systemic flu response."
-            ),
-            Rule(
-                rule_id="R05",
-                conditions=["cough", "sore_throat", "sneezing", "runny_nose"],
-                disease="common_flu",
-                confidence_boost=10,
-                severity="low",
-                explanation="Multiple upper respiratory symptoms together point toward influenza."
-            ),
-            Rule(
-                rule_id="R06",
-                conditions=["low_grade_fever", "fatigue", "cough"],
-                disease="common_flu",
-                confidence_boost=8,
-                severity="low",
-                explanation="Fatigue and cough with low-grade fever is a weak but supportive flu indicator."
-            ),
-
-            # ── DENGUE RULES ─────────────────────
-
-            Rule(
-                rule_id="R07",
-                conditions=["high_fever", "severe_headache", "pain_behind_eyes"],
-                disease="dengue",
-                confidence_boost=20,
-                severity="high",
-                explanation="High fever + severe headache + retro-orbital pain is a hallmark dengue triad."
-            ),
-            Rule(
-                rule_id="R08",
-                conditions=["high_fever", "joint_pain", "muscle_pain", "rash"],
-                disease="dengue",
-                confidence_boost=20,
-                severity="high",
-                explanation="Dengue's 'breakbone fever': high fever + severe joint/muscle pain + rash is strongly diagnostic."
-            ),
-            Rule(
-                rule_id="R09",
-                conditions=["high_fever", "rash", "nausea"],
-                disease="dengue",
-                confidence_boost=15,
-                severity="high",
-                explanation="Rash with high fever and nausea is a moderate dengue indicator."
-            ),
-            Rule(
-                rule_id="R10",
-                conditions=["high_fever", "low_platelet", "mild_bleeding"],
-                disease="dengue",
-                confidence_boost=20,
-                severity="high",
-                explanation="Low platelet count with bleeding signs is a critical dengue warning — seek care immediately."
-            ),
-            Rule(
-                rule_id="R11",
-                conditions=["high_fever", "pain_behind_eyes", "joint_pain"],
-                disease="dengue",
-                confidence_boost=18,
-                severity="high",
-                explanation="Retro-orbital pain + joint pain with high fever is highly specific to dengue."
-            ),
-            Rule(
-                rule_id="R12",
-                conditions=["high_fever", "fatigue", "nausea", "vomiting"],
-                disease="dengue",
-                confidence_boost=10,
-                severity="medium",
-                explanation="High fever with GI symptoms (nausea/vomiting) and fatigue supports dengue."
-            ),
-            Rule(
-                rule_id="R13",
-                conditions=["rash", "joint_pain", "fatigue"],
-                disease="dengue",
-                confidence_boost=8,
-                severity="medium",
-                explanation="Rash + joint pain + fatigue without high fever is a weak dengue indicator."
-            ),
-
-            # ── MALARIA RULES ────────────────────
-
-            Rule(
-                rule_id="R14",
-                conditions=["cyclical_fever", "chills", "sweating"],
-                disease="malaria",
-                confidence_boost=20,
-                severity="high",
-                explanation="The malaria fever cycle: cyclical fever + chills + profuse sweating is pathognomonic for malaria."
-            ),
-            Rule(
-                rule_id="R15",
-                conditions=["high_fever", "shivering", "sweating"],
-                disease="malaria",
-                confidence_boost=18,
-                severity="high",
-                explanation="High fever with rigors (shivering) followed by sweating is the classic malaria attack pattern."
-            ),
-            Rule(
-                rule_id="R16",
-                conditions=["high_fever", "chills", "headache", "nausea"],
-                disease="malaria",
-                confidence_boost=15,
-                severity="high",
-                explanation="Fever + chills + headache + nausea is a common malaria presentation."
-            ),
-            Rule(
-                rule_id="R17",
-                conditions=["anemia", "fatigue", "high_fever"],
-                disease="malaria",
-                confidence_boost=15,
-                severity="high",
-                explanation="Anemia + fever + fatigue suggests chronic malaria destroying red blood cells."
-            ),
-            Rule(
-                rule_id="R18",
-                conditions=["enlarged_spleen", "high_fever", "fatigue"],
-                disease="malaria",
-                confidence_boost=18,
-                severity="high",
-                explanation="Splenomegaly (enlarged spleen) with fever is a classic malaria sign."
-            ),
-            Rule(
-                rule_id="R19",
-                conditions=["high_fever", "muscle_pain", "vomiting", "chills"],
-                disease="malaria",
-                confidence_boost=14,
-                severity="high",
-                explanation="Fever + muscle pain + vomiting + chills together support malaria diagnosis."
-            ),
-            Rule(
-                rule_id="R20",
-                conditions=["cyclical_fever", "headache", "fatigue"],
-                disease="malaria",
-                confidence_boost=12,
-                severity="medium",
-                explanation="Cyclical fever pattern with headache and fatigue is a moderate malaria indicator."
-            ),
-
-            # ── TYPHOID RULES ────────────────────
-
-            Rule(
-                rule_id="R21",
-                conditions=["sustained_fever", "headache", "abdominal_pain"],
-                disease="typhoid",
-                confidence_boost=18,
-                severity="medium",
-                explanation="Sustained (step-ladder) fever + headache + abdominal pain is a classic typhoid presentation."
-            ),
-            Rule(
-                rule_id="R22",
-                conditions=["sustained_fever", "loss_of_appetite", "weakness"],
-                disease="typhoid",
-                confidence_boost=16,
-                severity="medium",
-                explanation="Prolonged fever with anorexia (loss of appetite) and weakness strongly suggests typhoid."
-            ),
-            Rule(
-                rule_id="R23",
-                conditions=["high_fever", "constipation", "abdominal_pain"],
-                disease="typhoid",
-                confidence_boost=15,
-                severity="medium",
-                explanation="Fever + constipation + abdominal pain is a common early typhoid symptom cluster."
-            ),
-            Rule(
-                rule_id="R24",
-                conditions=["rose_spots", "sustained_fever", "headache"],
-                disease="typhoid",
-                confidence_boost=20,
-                severity="medium",
-                explanation="Rose spots (rash on abdomen/chest) with sustained fever is nearly diagnostic of typhoid."
-            ),
-            Rule(
-                rule_id="R25",
-                conditions=["slow_heart_rate", "sustained_fever"],
-                disease="typhoid",
-                confidence_boost=18,
-                severity="medium",
-                explanation="Relative bradycardia (slow heart rate despite high fever) is a characteristic typhoid sign."
-            ),
-            Rule(
-                rule_id="R26",
-                conditions=["enlarged_liver", "sustained_fever", "weakness"],
-                disease="typhoid",
-                confidence_boost=16,
-                severity="medium",
-                explanation="Hepatomegaly (enlarged liver) with sustained fever points toward typhoid."
-            ),
-            Rule(
-                rule_id="R27",
-                conditions=["diarrhea", "sustained_fever", "abdominal_pain"],
-                disease="typhoid",
-                confidence_boost=14,
-                severity="medium",
-                explanation="Diarrhea + sustained fever + abdominal pain is a common late-stage typhoid pattern."
-            ),
-            Rule(
-                rule_id="R28",
-                conditions=["headache", "fatigue", "loss_of_appetite", "high_fever"],
-                disease="typhoid",
-                confidence_boost=12,
-                severity="medium",
-                explanation="General malaise with high fever can indicate typhoid."
-            ),
-            Rule(
-                rule_id="R29",
-                conditions=["high_fever"],
-                disease="dengue",
-                confidence_boost=5,
-                severity="medium",
-                explanation="High fever alone is a weak signal that could indicate dengue."
-            ),
-            Rule(
-                rule_id="R30",
-                conditions=["high_fever"],
-                disease="malaria",
-                confidence_boost=5,
-                severity="medium",
-                explanation="High fever alone is a weak signal that could indicate malaria."
-            ),
-            Rule(
-                rule_id="R31",
-                conditions=["high_fever"],
-                disease="typhoid",
-                confidence_boost=5,
-                severity="medium",
-                explanation="High fever alone is a weak signal that could indicate typhoid."
-            ),
-            
-            # ── WEAK SIGNAL RULES R32-R40 ────────
-
-            Rule(
-                rule_id="R32",
-                conditions=["low_grade_fever"],
-                disease="common_flu",
-                confidence_boost=6,
-                severity="low",
-                explanation="Low grade fever alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R33",
-                conditions=["low_grade_fever", "cough"],
-                disease="common_flu",
-                confidence_boost=8,
-                severity="low",
-                explanation="Low grade fever with cough is a moderate flu indicator."
-            ),
-            Rule(
-                rule_id="R34",
-                conditions=["low_grade_fever", "sore_throat"],
-                disease="common_flu",
-                confidence_boost=7,
-                severity="low",
-                explanation="Low grade fever with sore throat is a moderate flu indicator."
-            ),
-            Rule(
-                rule_id="R35",
-                conditions=["low_grade_fever", "body_ache"],
-                disease="common_flu",
-                confidence_boost=7,
-                severity="low",
-                explanation="Low grade fever with body ache is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R36",
-                conditions=["low_grade_fever", "headache"],
-                disease="common_flu",
-                confidence_boost=6,
-                severity="low",
-                explanation="Low grade fever with headache is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R37",
-                conditions=["low_grade_fever", "chills"],
-                disease="common_flu",
-                confidence_boost=7,
-                severity="low",
-                explanation="Low grade fever with chills is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R38",
-                conditions=["low_grade_fever", "fatigue", "body_ache"],
-                disease="common_flu",
-                confidence_boost=10,
-                severity="low",
-                explanation="Low grade fever + fatigue + body ache is a common flu presentation."
-            ),
-            Rule(
-                rule_id="R39",
-                conditions=["low_grade_fever", "abdominal_pain"],
-                disease="typhoid",
-                confidence_boost=8,
-                severity="medium",
-                explanation="Low grade fever with abdominal pain is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R40",
-                conditions=["low_grade_fever", "loss_of_appetite"],
-                disease="typhoid",
-                confidence_boost=7,
-                severity="medium",
-                explanation="Low grade fever with loss of appetite is a weak typhoid indicator."
-            ),
-            # ── CATCH-ALL SINGLE SYMPTOM RULES ──────────
-
-            Rule(
-                rule_id="R41",
-                conditions=["chills"],
-                disease="malaria",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Chills alone is a weak malaria indicator."
-            ),
-            Rule(
-                rule_id="R42",
-                conditions=["sweating"],
-                disease="malaria",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Profuse sweating alone is a weak malaria indicator."
-            ),
-            Rule(
-                rule_id="R43",
-                conditions=["cyclical_fever"],
-                disease="malaria",
-                confidence_boost=8,
-                severity="medium",
-                explanation="Cyclical fever alone is a moderate malaria indicator."
-            ),
-            Rule(
-                rule_id="R44",
-                conditions=["joint_pain"],
-                disease="dengue",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Joint pain alone is a weak dengue indicator."
-            ),
-            Rule(
-                rule_id="R45",
-                conditions=["pain_behind_eyes"],
-                disease="dengue",
-                confidence_boost=8,
-                severity="medium",
-                explanation="Pain behind eyes alone is a moderate dengue indicator."
-            ),
-            Rule(
-                rule_id="R46",
-                conditions=["severe_headache"],
-                disease="dengue",
-                confidence_boost=6,
-                severity="medium",
-                explanation="Severe headache alone is a weak dengue indicator."
-            ),
-            Rule(
-                rule_id="R47",
-                conditions=["rash"],
-                disease="dengue",
-                confidence_boost=6,
-                severity="medium",
-                explanation="Skin rash alone is a weak dengue indicator."
-            ),
-            Rule(
-                rule_id="R48",
-                conditions=["low_platelet"],
-                disease="dengue",
-                confidence_boost=8,
-                severity="high",
-                explanation="Low platelet count alone is a moderate dengue indicator."
-            ),
-            Rule(
-                rule_id="R49",
-                conditions=["mild_bleeding"],
-                disease="dengue",
-                confidence_boost=7,
-                severity="high",
-                explanation="Mild bleeding alone is a weak dengue indicator."
-            ),
-            Rule(
-                rule_id="R50",
-                conditions=["sustained_fever"],
-                disease="typhoid",
-                confidence_boost=8,
-                severity="medium",
-                explanation="Sustained fever alone is a moderate typhoid indicator."
-            ),
-            Rule(
-                rule_id="R51",
-                conditions=["abdominal_pain"],
-                disease="typhoid",
-                confidence_boost=6,
-                severity="medium",
-                explanation="Abdominal pain alone is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R52",
-                conditions=["loss_of_appetite"],
-                disease="typhoid",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Loss of appetite alone is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R53",
-                conditions=["rose_spots"],
-                disease="typhoid",
-                confidence_boost=10,
-                severity="medium",
-                explanation="Rose spots alone is a strong typhoid indicator."
-            ),
-            Rule(
-                rule_id="R54",
-                conditions=["slow_heart_rate"],
-                disease="typhoid",
-                confidence_boost=8,
-                severity="medium",
-                explanation="Slow heart rate alone is a moderate typhoid indicator."
-            ),
-            Rule(
-                rule_id="R55",
-                conditions=["enlarged_liver"],
-                disease="typhoid",
-                confidence_boost=7,
-                severity="medium",
-                explanation="Enlarged liver alone is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R56",
-                conditions=["constipation"],
-                disease="typhoid",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Constipation alone is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R57",
-                conditions=["enlarged_spleen"],
-                disease="malaria",
-                confidence_boost=8,
-                severity="high",
-                explanation="Enlarged spleen alone is a moderate malaria indicator."
-            ),
-            Rule(
-                rule_id="R58",
-                conditions=["anemia"],
-                disease="malaria",
-                confidence_boost=6,
-                severity="medium",
-                explanation="Anemia alone is a weak malaria indicator."
-            ),
-            Rule(
-                rule_id="R59",
-                conditions=["shivering"],
-                disease="malaria",
-                confidence_boost=7,
-                severity="medium",
-                explanation="Shivering/rigors alone is a weak malaria indicator."
-            ),
-            Rule(
-                rule_id="R60",
-                conditions=["sore_throat"],
-                disease="common_flu",
-                confidence_boost=6,
-                severity="low",
-                explanation="Sore throat alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R61",
-                conditions=["runny_nose"],
-                disease="common_flu",
-                confidence_boost=6,
-                severity="low",
-                explanation="Runny nose alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R62",
-                conditions=["sneezing"],
-                disease="common_flu",
-                confidence_boost=5,
-                severity="low",
-                explanation="Sneezing alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R63",
-                conditions=["body_ache"],
-                disease="common_flu",
-                confidence_boost=5,
-                severity="low",
-                explanation="Body ache alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R64",
-                conditions=["cough"],
-                disease="common_flu",
-                confidence_boost=6,
-                severity="low",
-                explanation="Cough alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R65",
-                conditions=["moderate_fever"],
-                disease="common_flu",
-                confidence_boost=6,
-                severity="low",
-                explanation="Mild fever alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R66",
-                conditions=["weakness"],
-                disease="typhoid",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Weakness alone is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R67",
-                conditions=["vomiting"],
-                disease="dengue",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Vomiting alone is a weak dengue indicator."
-            ),
-            Rule(
-                rule_id="R68",
-                conditions=["nausea"],
-                disease="dengue",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Nausea alone is a weak dengue indicator."
-            ),
-            Rule(
-                rule_id="R69",
-                conditions=["muscle_pain"],
-                disease="malaria",
-                confidence_boost=5,
-                severity="medium",
-                explanation="Muscle pain alone is a weak malaria indicator."
-            ),
-            Rule(
-                rule_id="R70",
-                conditions=["fatigue"],
-                disease="common_flu",
-                confidence_boost=5,
-                severity="low",
-                explanation="Fatigue alone is a weak flu indicator."
-            ),
-            Rule(
-                rule_id="R71",
-                conditions=["headache"],
-                disease="typhoid",
-                confidence_boost=5,
-                severity="low",
-                explanation="Headache alone is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R72",
-                conditions=["diarrhea"],
-                disease="typhoid",
-                confidence_boost=6,
-                severity="medium",
-                explanation="Diarrhea alone is a weak typhoid indicator."
-            ),
-            Rule(
-                rule_id="R73",
-                conditions=["moderate_fever", "cough", "sore_throat"],
-                disease="common_flu",
-                confidence_boost=12,
-                severity="low",
-                explanation="Moderate fever + cough + sore throat suggests flu or early stage infection."
-            ),
-            Rule(
-                rule_id="R74",
-                conditions=["moderate_fever", "headache", "body_ache"],
-                disease="common_flu",
-                confidence_boost=10,
-                severity="low",
-                explanation="Moderate fever + headache + body ache is a common flu pattern."
-            ),
-            Rule(
-                rule_id="R75",
-                conditions=["moderate_fever", "abdominal_pain"],
-                disease="typhoid",
-                confidence_boost=8,
-                severity="medium",
-                explanation="Moderate fever with abdominal pain is a weak typhoid indicator."
-            ),
-        ]
-
-        for rule in rules:
-            self.add_rule(rule)
+    def candidate_positions(self, symptoms) -> list:
+        """
+        Positions of the rules whose rarest condition is among the given
+        symptoms, in ascending order. Any other rule cannot fire.
+        """
+        self._ensure_indexes()
+        positions = set()
+        for s in symptoms:
+            positions.update(self._rules_by_pivot.get(s, ()))
+        return sorted(positions)
+
+    def matching_positions(self, symptoms) -> list:
+        """
+        Positions of the rules whose conditions all hold, in ascending
+        order, found by walking the condition trie.
+        """
+        self._ensure_indexes()
+        fired = []
+        stack = [self._rule_trie]
+        while stack:
+            children, here = stack.pop()
+            fired.extend(here)
+            # Probe from whichever side is smaller
+            if len(children) < len(symptoms):
+                stack.extend(node for cond, node in children.items()
+                             if cond in symptoms)
+            else:
+                for s in symptoms:
+                    node = children.get(s)
+                    if node is not None:
+                        stack.append(node)
+        fired.sort()
+        return fired
+
+    def get_candidate_rules(self, symptoms) -> list[Rule]:
+        """Rules that could fire for the given symptoms, in KB order."""
+        positions = self.candidate_positions(symptoms)
+        return [self._all_rules[pos] for pos in positions]
+
+    def get_all_rules(self) -> tuple[Rule, ...]:
+        self._ensure_indexes()
+        return self._all_rules
+
+    def get_rules_for_disease(self, disease: str) -> tuple[Rule, ...]:
+        self._ensure_indexes()
+        return self._rules_by_disease.get(disease, ())
+
+    def compile(self):
+        """Merges rules added since loading via `_merge_duplicates`."""
+        self._check_mutable()
+        merged = _merge_duplicates(self._rules)
+        if len(merged) != len(self._rules):
+            self._rules = merged
+            self.version += 1
+            self._rule_masks = None
+
+    def explain(self, rule_id: str) -> str:
+        """Explanation text of a rule, looked up by id."""
+        self._ensure_indexes()
+        return self._explanations[rule_id]
 
     def summary(self) -> dict:
         """Returns a summary of rules loaded per disease."""
-        summary = {}
-        for rule in self.rules:
-            summary[rule.disease] = summary.get(rule.disease, 0) + 1
-        return summary
+        self._ensure_indexes()
+        return dict(self._rule_counts)
+
+
+# ── Rule Table ───────────────────────────────
+# All medical diagnostic rules, built once on import and shared by every
+# KnowledgeBase. Rules based on WHO fever guidelines and standard medical
+# references.
+#
+# Built from source rather than unpickled from a cache: unpickling the tuple
+# measured slower than constructing it (~0.25 ms vs ~0.2 ms), and it would
+# skip Rule.__post_init__, which registers DISEASE_IDS and SYMPTOM_BITS.
+#
+# Confidence boost scale:
+#   5  → weak signal (common symptom, low specificity)
+#   10 → moderate signal
+#   15 → strong signal (more specific to this disease)
+#   20 → very strong / near-pathognomonic signal
+
+_RULES: tuple = tuple(_merge_duplicates([
+
+    # ── COMMON FLU RULES ─────────────────
+
+    Rule(
+        rule_id="R01",
+        conditions=("low_grade_fever", "cough", "sore_throat"),
+        disease="common_flu",
+        confidence_boost=15,
+        severity="low",
+        explanation="Classic triad of flu: low-grade fever + cough + sore throat strongly suggests influenza."
+    ),
+    Rule(
+        rule_id="R02",
+        conditions=("moderate_fever", "runny_nose", "sneezing"),
+        disease="common_flu",
+        confidence_boost=12,
+        severity="low",
+        explanation="Runny nose and sneezing with fever are hallmark upper respiratory flu symptoms."
+    ),
+    Rule(
+        rule_id="R03",
+        conditions=("moderate_fever", "body_ache", "fatigue"),
+        disease="common_flu",
+        confidence_boost=12,
+        severity="low",
+        explanation="Moderate fever with body ache and fatigue is a common flu presentation."
+    ),
+    Rule(
+        rule_id="R04",
+        conditions=("moderate_fever", "chills", "headache", "body_ache"),
+        disease="common_flu",
+        confidence_boost=14,
+        severity="low",
+        explanation="Chills + headache + body ache with fever is a typical systemic flu response."
+    ),
+    Rule(
+        rule_id="R05",
+        conditions=("cough", "sore_throat", "sneezing", "runny_nose"),
+        disease="common_flu",
+        confidence_boost=10,
+        severity="low",
+        explanation="Multiple upper respiratory symptoms together point toward influenza."
+    ),
+    Rule(
+        rule_id="R06",
+        conditions=("low_grade_fever", "fatigue", "cough"),
+        disease="common_flu",
+        confidence_boost=8,
+        severity="low",
+        explanation="Fatigue and cough with low-grade fever is a weak but supportive flu indicator."
+    ),
+
+    # ── DENGUE RULES ─────────────────────
+
+    Rule(
+        rule_id="R07",
+        conditions=("high_fever", "severe_headache", "pain_behind_eyes"),
+        disease="dengue",
+        confidence_boost=20,
+        severity="high",
+        explanation="High fever + severe headache + retro-orbital pain is a hallmark dengue triad."
+    ),
+    Rule(
+        rule_id="R08",
+        conditions=("high_fever", "joint_pain", "muscle_pain", "rash"),
+        disease="dengue",
+        confidence_boost=20,
+        severity="high",
+        explanation="Dengue's 'breakbone fever': high fever + severe joint/muscle pain + rash is strongly diagnostic."
+    ),
+    Rule(
+        rule_id="R09",
+        conditions=("high_fever", "rash", "nausea"),
+        disease="dengue",
+        confidence_boost=15,
+        severity="high",
+        explanation="Rash with high fever and nausea is a moderate dengue indicator."
+    ),
+    Rule(
+        rule_id="R10",
+        conditions=("high_fever", "low_platelet", "mild_bleeding"),
+        disease="dengue",
+        confidence_boost=20,
+        severity="high",
+        explanation="Low platelet count with bleeding signs is a critical dengue warning — seek care immediately."
+    ),
+    Rule(
+        rule_id="R11",
+        conditions=("high_fever", "pain_behind_eyes", "joint_pain"),
+        disease="dengue",
+        confidence_boost=18,
+        severity="high",
+        explanation="Retro-orbital pain + joint pain with high fever is highly specific to dengue."
+    ),
+    Rule(
+        rule_id="R12",
+        conditions=("high_fever", "fatigue", "nausea", "vomiting"),
+        disease="dengue",
+        confidence_boost=10,
+        severity="medium",
+        explanation="High fever with GI symptoms (nausea/vomiting) and fatigue supports dengue."
+    ),
+    Rule(
+        rule_id="R13",
+        conditions=("rash", "joint_pain", "fatigue"),
+        disease="dengue",
+        confidence_boost=8,
+        severity="medium",
+        explanation="Rash + joint pain + fatigue without high fever is a weak dengue indicator."
+    ),
+
+    # ── MALARIA RULES ────────────────────
+
+    Rule(
+        rule_id="R14",
+        conditions=("cyclical_fever", "chills", "sweating"),
+        disease="malaria",
+        confidence_boost=20,
+        severity="high",
+        explanation="The malaria fever cycle: cyclical fever + chills + profuse sweating is pathognomonic for malaria."
+    ),
+    Rule(
+        rule_id="R15",
+        conditions=("high_fever", "shivering", "sweating"),
+        disease="malaria",
+        confidence_boost=18,
+        severity="high",
+        explanation="High fever with rigors (shivering) followed by sweating is the classic malaria attack pattern."
+    ),
+    Rule(
+        rule_id="R16",
+        conditions=("high_fever", "chills", "headache", "nausea"),
+        disease="malaria",
+        confidence_boost=15,
+        severity="high",
+        explanation="Fever + chills + headache + nausea is a common malaria presentation."
+    ),
+    Rule(
+        rule_id="R17",
+        conditions=("anemia", "fatigue", "high_fever"),
+        disease="malaria",
+        confidence_boost=15,
+        severity="high",
+        explanation="Anemia + fever + fatigue suggests chronic malaria destroying red blood cells."
+    ),
+    Rule(
+        rule_id="R18",
+        conditions=("enlarged_spleen", "high_fever", "fatigue"),
+        disease="malaria",
+        confidence_boost=18,
+        severity="high",
+        explanation="Splenomegaly (enlarged spleen) with fever is a classic malaria sign."
+    ),
+    Rule(
+        rule_id="R19",
+        conditions=("high_fever", "muscle_pain", "vomiting", "chills"),
+        disease="malaria",
+        confidence_boost=14,
+        severity="high",
+        explanation="Fever + muscle pain + vomiting + chills together support malaria diagnosis."
+    ),
+    Rule(
+        rule_id="R20",
+        conditions=("cyclical_fever", "headache", "fatigue"),
+        disease="malaria",
+        confidence_boost=12,
+        severity="medium",
+        explanation="Cyclical fever pattern with headache and fatigue is a moderate malaria indicator."
+    ),
+
+    # ── TYPHOID RULES ────────────────────
+
+    Rule(
+        rule_id="R21",
+        conditions=("sustained_fever", "headache", "abdominal_pain"),
+        disease="typhoid",
+        confidence_boost=18,
+        severity="medium",
+        explanation="Sustained (step-ladder) fever + headache + abdominal pain is a classic typhoid presentation."
+    ),
+    Rule(
+        rule_id="R22",
+        conditions=("sustained_fever", "loss_of_appetite", "weakness"),
+        disease="typhoid",
+        confidence_boost=16,
+        severity="medium",
+        explanation="Prolonged fever with anorexia (loss of appetite) and weakness strongly suggests typhoid."
+    ),
+    Rule(
+        rule_id="R23",
+        conditions=("high_fever", "constipation", "abdominal_pain"),
+        disease="typhoid",
+        confidence_boost=15,
+        severity="medium",
+        explanation="Fever + constipation + abdominal pain is a common early typhoid symptom cluster."
+    ),
+    Rule(
+        rule_id="R24",
+        conditions=("rose_spots", "sustained_fever", "headache"),
+        disease="typhoid",
+        confidence_boost=20,
+        severity="medium",
+        explanation="Rose spots (rash on abdomen/chest) with sustained fever is nearly diagnostic of typhoid."
+    ),
+    Rule(
+        rule_id="R25",
+        conditions=("slow_heart_rate", "sustained_fever"),
+        disease="typhoid",
+        confidence_boost=18,
+        severity="medium",
+        explanation="Relative bradycardia (slow heart rate despite high fever) is a characteristic typhoid sign."
+    ),
+    Rule(
+        rule_id="R26",
+        conditions=("enlarged_liver", "sustained_fever", "weakness"),
+        disease="typhoid",
+        confidence_boost=16,
+        severity="medium",
+        explanation="Hepatomegaly (enlarged liver) with sustained fever points toward typhoid."
+    ),
+    Rule(
+        rule_id="R27",
+        conditions=("diarrhea", "sustained_fever", "abdominal_pain"),
+        disease="typhoid",
+        confidence_boost=14,
+        severity="medium",
+        explanation="Diarrhea + sustained fever + abdominal pain is a common late-stage typhoid pattern."
+    ),
+    Rule(
+        rule_id="R28",
+        conditions=("headache", "fatigue", "loss_of_appetite", "high_fever"),
+        disease="typhoid",
+        confidence_boost=12,
+        severity="medium",
+        explanation="General malaise with high fever can indicate typhoid."
+    ),
+    Rule(
+        rule_id="R29",
+        conditions=("high_fever",),
+        disease="dengue",
+        confidence_boost=5,
+        severity="medium",
+        explanation="High fever alone is a weak signal that could indicate dengue."
+    ),
+    Rule(
+        rule_id="R30",
+        conditions=("high_fever",),
+        disease="malaria",
+        confidence_boost=5,
+        severity="medium",
+        explanation="High fever alone is a weak signal that could indicate malaria."
+    ),
+    Rule(
+        rule_id="R31",
+        conditions=("high_fever",),
+        disease="typhoid",
+        confidence_boost=5,
+        severity="medium",
+        explanation="High fever alone is a weak signal that could indicate typhoid."
+    ),
+
+    # ── WEAK SIGNAL RULES R32-R40 ────────
+
+    Rule(
+        rule_id="R32",
+        conditions=("low_grade_fever",),
+        disease="common_flu",
+        confidence_boost=6,
+        severity="low",
+        explanation="Low grade fever alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R33",
+        conditions=("low_grade_fever", "cough"),
+        disease="common_flu",
+        confidence_boost=8,
+        severity="low",
+        explanation="Low grade fever with cough is a moderate flu indicator."
+    ),
+    Rule(
+        rule_id="R34",
+        conditions=("low_grade_fever", "sore_throat"),
+        disease="common_flu",
+        confidence_boost=7,
+        severity="low",
+        explanation="Low grade fever with sore throat is a moderate flu indicator."
+    ),
+    Rule(
+        rule_id="R35",
+        conditions=("low_grade_fever", "body_ache"),
+        disease="common_flu",
+        confidence_boost=7,
+        severity="low",
+        explanation="Low grade fever with body ache is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R36",
+        conditions=("low_grade_fever", "headache"),
+        disease="common_flu",
+        confidence_boost=6,
+        severity="low",
+        explanation="Low grade fever with headache is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R37",
+        conditions=("low_grade_fever", "chills"),
+        disease="common_flu",
+        confidence_boost=7,
+        severity="low",
+        explanation="Low grade fever with chills is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R38",
+        conditions=("low_grade_fever", "fatigue", "body_ache"),
+        disease="common_flu",
+        confidence_boost=10,
+        severity="low",
+        explanation="Low grade fever + fatigue + body ache is a common flu presentation."
+    ),
+    Rule(
+        rule_id="R39",
+        conditions=("low_grade_fever", "abdominal_pain"),
+        disease="typhoid",
+        confidence_boost=8,
+        severity="medium",
+        explanation="Low grade fever with abdominal pain is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R40",
+        conditions=("low_grade_fever", "loss_of_appetite"),
+        disease="typhoid",
+        confidence_boost=7,
+        severity="medium",
+        explanation="Low grade fever with loss of appetite is a weak typhoid indicator."
+    ),
+    # ── CATCH-ALL SINGLE SYMPTOM RULES ──────────
+
+    Rule(
+        rule_id="R41",
+        conditions=("chills",),
+        disease="malaria",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Chills alone is a weak malaria indicator."
+    ),
+    Rule(
+        rule_id="R42",
+        conditions=("sweating",),
+        disease="malaria",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Profuse sweating alone is a weak malaria indicator."
+    ),
+    Rule(
+        rule_id="R43",
+        conditions=("cyclical_fever",),
+        disease="malaria",
+        confidence_boost=8,
+        severity="medium",
+        explanation="Cyclical fever alone is a moderate malaria indicator."
+    ),
+    Rule(
+        rule_id="R44",
+        conditions=("joint_pain",),
+        disease="dengue",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Joint pain alone is a weak dengue indicator."
+    ),
+    Rule(
+        rule_id="R45",
+        conditions=("pain_behind_eyes",),
+        disease="dengue",
+        confidence_boost=8,
+        severity="medium",
+        explanation="Pain behind eyes alone is a moderate dengue indicator."
+    ),
+    Rule(
+        rule_id="R46",
+        conditions=("severe_headache",),
+        disease="dengue",
+        confidence_boost=6,
+        severity="medium",
+        explanation="Severe headache alone is a weak dengue indicator."
+    ),
+    Rule(
+        rule_id="R47",
+        conditions=("rash",),
+        disease="dengue",
+        confidence_boost=6,
+        severity="medium",
+        explanation="Skin rash alone is a weak dengue indicator."
+    ),
+    Rule(
+        rule_id="R48",
+        conditions=("low_platelet",),
+        disease="dengue",
+        confidence_boost=8,
+        severity="high",
+        explanation="Low platelet count alone is a moderate dengue indicator."
+    ),
+    Rule(
+        rule_id="R49",
+        conditions=("mild_bleeding",),
+        disease="dengue",
+        confidence_boost=7,
+        severity="high",
+        explanation="Mild bleeding alone is a weak dengue indicator."
+    ),
+    Rule(
+        rule_id="R50",
+        conditions=("sustained_fever",),
+        disease="typhoid",
+        confidence_boost=8,
+        severity="medium",
+        explanation="Sustained fever alone is a moderate typhoid indicator."
+    ),
+    Rule(
+        rule_id="R51",
+        conditions=("abdominal_pain",),
+        disease="typhoid",
+        confidence_boost=6,
+        severity="medium",
+        explanation="Abdominal pain alone is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R52",
+        conditions=("loss_of_appetite",),
+        disease="typhoid",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Loss of appetite alone is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R53",
+        conditions=("rose_spots",),
+        disease="typhoid",
+        confidence_boost=10,
+        severity="medium",
+        explanation="Rose spots alone is a strong typhoid indicator."
+    ),
+    Rule(
+        rule_id="R54",
+        conditions=("slow_heart_rate",),
+        disease="typhoid",
+        confidence_boost=8,
+        severity="medium",
+        explanation="Slow heart rate alone is a moderate typhoid indicator."
+    ),
+    Rule(
+        rule_id="R55",
+        conditions=("enlarged_liver",),
+        disease="typhoid",
+        confidence_boost=7,
+        severity="medium",
+        explanation="Enlarged liver alone is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R56",
+        conditions=("constipation",),
+        disease="typhoid",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Constipation alone is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R57",
+        conditions=("enlarged_spleen",),
+        disease="malaria",
+        confidence_boost=8,
+        severity="high",
+        explanation="Enlarged spleen alone is a moderate malaria indicator."
+    ),
+    Rule(
+        rule_id="R58",
+        conditions=("anemia",),
+        disease="malaria",
+        confidence_boost=6,
+        severity="medium",
+        explanation="Anemia alone is a weak malaria indicator."
+    ),
+    Rule(
+        rule_id="R59",
+        conditions=("shivering",),
+        disease="malaria",
+        confidence_boost=7,
+        severity="medium",
+        explanation="Shivering/rigors alone is a weak malaria indicator."
+    ),
+    Rule(
+        rule_id="R60",
+        conditions=("sore_throat",),
+        disease="common_flu",
+        confidence_boost=6,
+        severity="low",
+        explanation="Sore throat alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R61",
+        conditions=("runny_nose",),
+        disease="common_flu",
+        confidence_boost=6,
+        severity="low",
+        explanation="Runny nose alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R62",
+        conditions=("sneezing",),
+        disease="common_flu",
+        confidence_boost=5,
+        severity="low",
+        explanation="Sneezing alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R63",
+        conditions=("body_ache",),
+        disease="common_flu",
+        confidence_boost=5,
+        severity="low",
+        explanation="Body ache alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R64",
+        conditions=("cough",),
+        disease="common_flu",
+        confidence_boost=6,
+        severity="low",
+        explanation="Cough alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R65",
+        conditions=("moderate_fever",),
+        disease="common_flu",
+        confidence_boost=6,
+        severity="low",
+        explanation="Mild fever alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R66",
+        conditions=("weakness",),
+        disease="typhoid",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Weakness alone is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R67",
+        conditions=("vomiting",),
+        disease="dengue",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Vomiting alone is a weak dengue indicator."
+    ),
+    Rule(
+        rule_id="R68",
+        conditions=("nausea",),
+        disease="dengue",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Nausea alone is a weak dengue indicator."
+    ),
+    Rule(
+        rule_id="R69",
+        conditions=("muscle_pain",),
+        disease="malaria",
+        confidence_boost=5,
+        severity="medium",
+        explanation="Muscle pain alone is a weak malaria indicator."
+    ),
+    Rule(
+        rule_id="R70",
+        conditions=("fatigue",),
+        disease="common_flu",
+        confidence_boost=5,
+        severity="low",
+        explanation="Fatigue alone is a weak flu indicator."
+    ),
+    Rule(
+        rule_id="R71",
+        conditions=("headache",),
+        disease="typhoid",
+        confidence_boost=5,
+        severity="low",
+        explanation="Headache alone is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R72",
+        conditions=("diarrhea",),
+        disease="typhoid",
+        confidence_boost=6,
+        severity="medium",
+        explanation="Diarrhea alone is a weak typhoid indicator."
+    ),
+    Rule(
+        rule_id="R73",
+        conditions=("moderate_fever", "cough", "sore_throat"),
+        disease="common_flu",
+        confidence_boost=12,
+        severity="low",
+        explanation="Moderate fever + cough + sore throat suggests flu or early stage infection."
+    ),
+    Rule(
+        rule_id="R74",
+        conditions=("moderate_fever", "headache", "body_ache"),
+        disease="common_flu",
+        confidence_boost=10,
+        severity="low",
+        explanation="Moderate fever + headache + body ache is a common flu pattern."
+    ),
+    Rule(
+        rule_id="R75",
+        conditions=("moderate_fever", "abdominal_pain"),
+        disease="typhoid",
+        confidence_boost=8,
+        severity="medium",
+        explanation="Moderate fever with abdominal pain is a weak typhoid indicator."
+    ),
+]))
+
+
+@lru_cache(maxsize=1)
+def get_knowledge_base() -> KnowledgeBase:
+    """The process-wide, read-only KnowledgeBase."""
+    return KnowledgeBase(frozen=True)
 
 
 # ── Quick test when run directly ─────────────
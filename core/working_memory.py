@@ -10,6 +10,24 @@ Facts include:
   - Patient metadata (age, temperature, illness duration)
 """
 
+from sys import intern
+
+from core.knowledge_base import symptom_mask
+
+
+# ── Symptom normalization ────────────────────
+# Raw spelling -> interned canonical key. Symptoms come from a small,
+# fixed vocabulary, so each spelling is stripped/lowered only once.
+
+_NORM_CACHE: dict = {}
+
+
+def _norm(symptom: str) -> str:
+    key = _NORM_CACHE.get(symptom)
+    if key is None:
+        key = _NORM_CACHE[symptom] = intern(symptom.strip().lower())
+    return key
+
 
 class WorkingMemory:
     """
@@ -17,6 +35,8 @@ class WorkingMemory:
     The inference engine reads from this to match against rules.
     """
 
+    __slots__ = ("symptoms", "patient_info")
+
     def __init__(self):
         self.symptoms: set = set()        # e.g., {"high_fever", "chills", "rash"}
         self.patient_info: dict = {}      # e.g., {"age": 25, "temperature": 103.5}
@@ -24,26 +44,34 @@ class WorkingMemory:
     # ── Symptom Management ──────────────────────
 
     def add_symptom(self, symptom: str):
-        """Add a single symptom fact."""
-        self.symptoms.add(symptom.strip().lower())
+        """Add a single symptom fact (interned, like rule conditions)."""
+        self.symptoms.add(_norm(symptom))
 
     def add_symptoms(self, symptoms: list):
         """Add multiple symptom facts at once."""
-        for s in symptoms:
-            self.add_symptom(s)
+        self.symptoms.update(map(_norm, symptoms))
 
     def remove_symptom(self, symptom: str):
         """Remove a symptom if present."""
-        self.symptoms.discard(symptom.strip().lower())
+        self.symptoms.discard(_norm(symptom))
 
     def has_symptom(self, symptom: str) -> bool:
         """Check if a symptom is present."""
-        return symptom.strip().lower() in self.symptoms
+        return _norm(symptom) in self.symptoms
 
     def clear_symptoms(self):
         """Clear all symptoms (start fresh)."""
         self.symptoms.clear()
 
+    @property
+    def mask(self) -> int:
+        """
+        Symptoms as a SYMPTOM_BITS bitmask, for one-AND rule matching.
+        Symptoms no rule mentions have no bit. Built from the live set on
+        every read, so direct edits to `symptoms` are never missed.
+        """
+        return symptom_mask(self.symptoms)
+
     # ── Patient Info ─────────────────────────────
 
     def set_patient_info(self, key: str, value):
@@ -63,7 +91,10 @@ class WorkingMemory:
 
     def get_all_symptoms(self) -> list:
         """Return sorted list of all current symptoms."""
-        return sorted(list(self.symptoms))
+        return sorted(self.symptoms)
+
+    def is_empty(self) -> bool:
+        return not self.symptoms
 
     def symptom_count(self) -> int:
         return len(self.symptoms)
@@ -7,11 +7,12 @@ Usage:
     python day1_verify.py
 """
 
-import json, os, sys
+import os, sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from core.knowledge_base import KnowledgeBase
+from core.knowledge_base import get_knowledge_base
 from core.working_memory import WorkingMemory
+from core.inference_engine import load_disease_data
 
 GREEN  = "\033[92m"
 BLUE   = "\033[94m"
@@ -20,6 +21,9 @@ CYAN   = "\033[96m"
 BOLD   = "\033[1m"
 RESET  = "\033[0m"
 
+FIRES   = f"  {GREEN}FIRES{RESET} "
+MATCHED = "         Matched: "
+
 def section(title):
     print(f"\n{BOLD}{BLUE}{'═'*55}{RESET}")
     print(f"{BOLD}{BLUE}  {title}{RESET}")
@@ -30,15 +34,14 @@ def check(label):
 
 # 1. diseases.json
 section("STEP 1 — diseases.json")
-with open("data/diseases.json") as f:
-    data = json.load(f)
+data = load_disease_data()
 for name, info in data["diseases"].items():
     check(f"{info['display_name']} — severity: {info['severity'].upper()}, {len(info['symptoms'])} symptoms")
 check(f"Symptom display labels: {len(data['symptoms_display'])} entries")
 
 # 2. KnowledgeBase
 section("STEP 2 — KnowledgeBase")
-kb = KnowledgeBase()
+kb = get_knowledge_base()
 summary = kb.summary()
 for disease, count in summary.items():
     check(f"{disease:<20} → {count} rules loaded")
@@ -59,11 +62,11 @@ check(f"has_symptom('rash'): {wm.has_symptom('rash')} (correctly False)")
 section("STEP 4 — Rule Matching Preview")
 print(f"\n  {YELLOW}Symptoms:{RESET} {wm.get_all_symptoms()}\n")
 fired = []
-for rule in kb.get_all_rules():
-    if all(cond in wm.symptoms for cond in rule.conditions):
+for rule in kb.get_candidate_rules(wm.symptoms):
+    if rule.conditions_fs <= wm.symptoms:
         fired.append(rule)
-        print(f"  {GREEN}FIRES{RESET} [{rule.rule_id}] → {rule.disease} (+{rule.confidence_boost})")
-        print(f"         Matched: {rule.conditions}")
+        print(FIRES + f"[{rule.rule_id}] → {rule.disease} (+{rule.confidence_boost})")
+        print(MATCHED + str(rule.conditions))
 print(f"\n  Total rules fired: {len(fired)}")
 
 section("DAY 1 COMPLETE ✓")
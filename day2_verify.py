@@ -12,10 +12,9 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from core.knowledge_base import KnowledgeBase
+from core.knowledge_base import get_knowledge_base
 from core.working_memory import WorkingMemory
 from core.inference_engine import InferenceEngine
-from core.explanation import ExplanationModule
 
 GREEN    = "\033[92m"
 RED      = "\033[91m"
@@ -32,6 +31,9 @@ SEV_COLOR = {
     "critical" : "\033[95m",   # magenta
 }
 
+# Likelihood bars for 0–20 filled cells (one cell per 5%)
+BARS = ["█" * i + "░" * (20 - i) for i in range(21)]
+
 def section(title):
     print(f"\n{BOLD}{BLUE}{'═'*60}{RESET}")
     print(f"{BOLD}{BLUE}  {title}{RESET}")
@@ -51,7 +53,7 @@ def print_results(results, expected_top):
     for i, r in enumerate(results, 1):
         sev_col = SEV_COLOR.get(r.severity, RESET)
         bar_len = int(r.confidence / 5)
-        bar = "█" * bar_len + "░" * (20 - bar_len)
+        bar = BARS[bar_len]
         print(f"  #{i} {BOLD}{r.display_name:<30}{RESET} "
               f"{CYAN}{r.confidence:>5.1f}%{RESET}  "
               f"[{bar}]  "
@@ -69,7 +71,7 @@ def print_results(results, expected_top):
 
 # ── Test Cases ───────────────────────────────
 
-kb = KnowledgeBase()
+kb = get_knowledge_base()
 
 # ══════════════════════════════════════════════
 # TEST 1: Common Flu
@@ -135,6 +137,7 @@ print_results(results4, "typhoid")
 # TEST 5: Explanation Module
 # ══════════════════════════════════════════════
 section("TEST 5 — Explanation Module (Dengue)")
+from core.explanation import ExplanationModule   # only this test needs it
 if results2:
     exp = ExplanationModule(results2[0], wm2.get_all_symptoms())
     print(exp.get_full_explanation())
@@ -13,7 +13,9 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pytest
-from core.knowledge_base import KnowledgeBase
+from core.knowledge_base import (
+    DISEASE_IDS, KnowledgeBase, Rule, get_knowledge_base, symptom_mask
+)
 from core.working_memory import WorkingMemory
 from core.inference_engine import InferenceEngine
 from core.explanation import ExplanationModule
@@ -24,6 +26,12 @@ from core.explanation import ExplanationModule
 @pytest.fixture
 def kb():
     """Shared KnowledgeBase instance for all tests."""
+    return get_knowledge_base()
+
+
+@pytest.fixture
+def mutable_kb():
+    """Private KnowledgeBase for tests that add rules."""
     return KnowledgeBase()
 
 
@@ -31,8 +39,12 @@ def run_diagnosis(kb, symptoms: list) -> list:
     """Helper — create WM, add symptoms, run engine, return results."""
     wm = WorkingMemory()
     wm.add_symptoms(symptoms)
-    engine = InferenceEngine(kb, wm)
-    return engine.run()
+    return InferenceEngine(kb, wm).run()
+
+
+def by_disease(results) -> dict:
+    """Index results by disease key."""
+    return {r.disease: r for r in results}
 
 
 # ══════════════════════════════════════════════
@@ -78,6 +90,81 @@ class TestKnowledgeBase:
         ids = [r.rule_id for r in kb.get_all_rules()]
         assert len(ids) == len(set(ids))
 
+    def test_rule_added_after_first_run_fires(self, mutable_kb):
+        """add_rule must invalidate the cached symptom bitmasks."""
+        run_diagnosis(mutable_kb, ["high_fever"])
+        mutable_kb.add_rule(Rule("X01", ["brand_new_symptom"], "malaria", 10, "high", "Test rule."))
+        results = run_diagnosis(mutable_kb, ["brand_new_symptom"])
+        assert results[0].disease == "malaria"
+
+    def test_add_rules_bulk(self, mutable_kb):
+        count = len(mutable_kb.get_all_rules())
+        mutable_kb.add_rules([
+            Rule("X04", ["brand_new_symptom"], "dengue", 10, "medium", "Test."),
+            Rule("X05", ["brand_new_symptom"], "dengue", 5, "low", "Test."),
+        ])
+        assert len(mutable_kb.get_all_rules()) == count + 2
+        assert run_diagnosis(mutable_kb, ["brand_new_symptom"])[0].disease == "dengue"
+
+    def test_rules_only_change_through_add_rule(self, mutable_kb):
+        """`rules` is a read-only view that tracks add_rule()."""
+        with pytest.raises(AttributeError):
+            mutable_kb.rules.append(Rule("X06", ["rash"], "dengue", 5, "low", "Test."))
+        rule = Rule("X07", ["brand_new_symptom"], "typhoid", 5, "low", "Test.")
+        mutable_kb.add_rule(rule)
+        assert mutable_kb.rules[-1] is rule
+        assert mutable_kb.rules == mutable_kb.get_all_rules()
+
+    def test_compile_merges_duplicate_rules(self, mutable_kb):
+        """Rules with identical disease + conditions collapse into one."""
+        count = len(mutable_kb.get_all_rules())
+        mutable_kb.add_rule(Rule("X02", ["rose_spots"], "typhoid", 4, "high", "Duplicate."))
+        mutable_kb.compile()
+        rules = mutable_kb.get_all_rules()
+        merged = next(r for r in rules if r.rule_id == "R53+X02")
+        assert len(rules) == count
+        assert merged.confidence_boost == 14
+        assert merged.severity == "high"
+
+    def test_candidate_rules_cover_every_firing_rule(self, kb):
+        """Pruning by symptom never drops a rule that would fire."""
+        facts = {"high_fever", "chills", "sweating", "rash"}
+        candidates = kb.get_candidate_rules(facts)
+        firing = [r for r in kb.get_all_rules() if set(r.conditions) <= facts]
+        assert firing and all(r in candidates for r in firing)
+        assert len(candidates) < len(kb.get_all_rules())
+
+    def test_trie_matches_brute_force(self, kb):
+        """The condition trie finds exactly the rules whose conditions hold."""
+        facts = {"high_fever", "chills", "sweating", "headache", "nausea", "rash"}
+        expected = [pos for pos, r in enumerate(kb.get_all_rules())
+                    if set(r.conditions) <= facts]
+        assert kb.matching_positions(facts) == expected
+
+    def test_explain_looks_up_rule_text(self, kb):
+        rule = kb.get_all_rules()[0]
+        assert kb.explain(rule.rule_id) == rule.explanation
+
+    def test_shared_knowledge_base_is_read_only(self, mutable_kb):
+        """get_knowledge_base() is a singleton that rejects new rules."""
+        shared = get_knowledge_base()
+        assert shared is get_knowledge_base()
+        assert shared.get_all_rules() == mutable_kb.get_all_rules()
+        with pytest.raises(RuntimeError):
+            shared.add_rule(Rule("X03", ["rash"], "dengue", 5, "low", "Test."))
+
+    def test_kb_score_matches_fired_rules(self, kb):
+        """Column-wise scoring must agree with the engine's fired rules."""
+        facts = ["high_fever", "chills", "sweating", "rash", "joint_pain"]
+        engine = InferenceEngine(kb, WorkingMemory())
+        engine.wm.add_symptoms(facts)
+        engine.run()
+        expected = [0.0] * len(DISEASE_IDS)
+        for fired in engine.get_fired_rules():
+            expected[DISEASE_IDS[fired.disease]] += fired.confidence_boost
+        assert kb.score(symptom_mask(facts)) == tuple(expected)
+        assert kb.score(symptom_mask(facts)) is kb.score(symptom_mask(facts))
+
 
 # ══════════════════════════════════════════════
 # WORKING MEMORY TESTS
@@ -135,6 +222,22 @@ class TestWorkingMemory:
         wm.add_symptom("FEVER")
         assert wm.has_symptom("fever")
 
+    def test_mask_tracks_symptoms(self):
+        wm = WorkingMemory()
+        wm.add_symptoms(["fever", "cough", "not_in_any_rule"])
+        assert wm.mask == symptom_mask(["fever", "cough"])
+        wm.remove_symptom("cough")
+        assert wm.mask == symptom_mask(["fever"])
+        wm.reset()
+        assert wm.mask == 0
+
+    def test_sorted_symptoms_refresh_after_changes(self):
+        wm = WorkingMemory()
+        wm.add_symptoms(["rash", "cough"])
+        assert wm.get_all_symptoms() == ["cough", "rash"]
+        wm.add_symptom("chills")
+        assert wm.get_all_symptoms() == ["chills", "cough", "rash"]
+
 
 # ══════════════════════════════════════════════
 # INFERENCE ENGINE — DISEASE TESTS
@@ -156,21 +259,21 @@ class TestCommonFluDiagnosis:
         results = run_diagnosis(kb, [
             "fever", "cough", "sore_throat", "runny_nose", "sneezing"
         ])
-        flu = next((r for r in results if r.disease == "common_flu"), None)
+        flu = by_disease(results).get("common_flu")
         assert flu is not None
         assert flu.confidence > 30
 
     def test_flu_severity_is_low(self, kb):
         """Flu should have low severity."""
         results = run_diagnosis(kb, ["fever", "cough", "sore_throat"])
-        flu = next((r for r in results if r.disease == "common_flu"), None)
+        flu = by_disease(results).get("common_flu")
         assert flu is not None
         assert flu.severity == "low"
 
     def test_flu_has_recommendation(self, kb):
         """Flu result should have a non-empty recommendation."""
         results = run_diagnosis(kb, ["fever", "cough", "sore_throat"])
-        flu = next((r for r in results if r.disease == "common_flu"), None)
+        flu = by_disease(results).get("common_flu")
         assert flu is not None
         assert flu.recommended_action != ""
 
@@ -192,7 +295,7 @@ class TestDengueDiagnosis:
             "high_fever", "severe_headache",
             "pain_behind_eyes", "joint_pain", "rash"
         ])
-        dengue = next((r for r in results if r.disease == "dengue"), None)
+        dengue = by_disease(results).get("dengue")
         assert dengue is not None
         assert dengue.confidence > 40
 
@@ -201,7 +304,7 @@ class TestDengueDiagnosis:
         results = run_diagnosis(kb, [
             "high_fever", "severe_headache", "pain_behind_eyes"
         ])
-        dengue = next((r for r in results if r.disease == "dengue"), None)
+        dengue = by_disease(results).get("dengue")
         assert dengue is not None
         assert dengue.severity == "high"
 
@@ -210,7 +313,7 @@ class TestDengueDiagnosis:
         results = run_diagnosis(kb, [
             "high_fever", "joint_pain", "muscle_pain", "rash"
         ])
-        dengue = next((r for r in results if r.disease == "dengue"), None)
+        dengue = by_disease(results).get("dengue")
         assert dengue is not None
 
     def test_dengue_bleeding_signs(self, kb):
@@ -218,7 +321,7 @@ class TestDengueDiagnosis:
         results = run_diagnosis(kb, [
             "high_fever", "low_platelet", "mild_bleeding"
         ])
-        dengue = next((r for r in results if r.disease == "dengue"), None)
+        dengue = by_disease(results).get("dengue")
         assert dengue is not None
         assert dengue.confidence > 50
 
@@ -239,7 +342,7 @@ class TestMalariaDiagnosis:
         results = run_diagnosis(kb, [
             "cyclical_fever", "chills", "sweating", "high_fever"
         ])
-        malaria = next((r for r in results if r.disease == "malaria"), None)
+        malaria = by_disease(results).get("malaria")
         assert malaria is not None
         assert malaria.confidence > 40
 
@@ -248,7 +351,7 @@ class TestMalariaDiagnosis:
         results = run_diagnosis(kb, [
             "cyclical_fever", "chills", "sweating"
         ])
-        malaria = next((r for r in results if r.disease == "malaria"), None)
+        malaria = by_disease(results).get("malaria")
         assert malaria is not None
         assert malaria.severity == "high"
 
@@ -257,7 +360,7 @@ class TestMalariaDiagnosis:
         results = run_diagnosis(kb, [
             "cyclical_fever", "chills", "sweating"
         ])
-        malaria = next((r for r in results if r.disease == "malaria"), None)
+        malaria = by_disease(results).get("malaria")
         assert malaria is not None
 
     def test_malaria_splenomegaly(self, kb):
@@ -265,7 +368,7 @@ class TestMalariaDiagnosis:
         results = run_diagnosis(kb, [
             "enlarged_spleen", "high_fever", "fatigue"
         ])
-        malaria = next((r for r in results if r.disease == "malaria"), None)
+        malaria = by_disease(results).get("malaria")
         assert malaria is not None
 
 
@@ -286,7 +389,7 @@ class TestTyphoidDiagnosis:
             "sustained_fever", "headache",
             "abdominal_pain", "loss_of_appetite"
         ])
-        typhoid = next((r for r in results if r.disease == "typhoid"), None)
+        typhoid = by_disease(results).get("typhoid")
         assert typhoid is not None
         assert typhoid.confidence > 40
 
@@ -295,7 +398,7 @@ class TestTyphoidDiagnosis:
         results = run_diagnosis(kb, [
             "rose_spots", "sustained_fever", "headache"
         ])
-        typhoid = next((r for r in results if r.disease == "typhoid"), None)
+        typhoid = by_disease(results).get("typhoid")
         assert typhoid is not None
         assert typhoid.confidence > 50
 
@@ -304,7 +407,7 @@ class TestTyphoidDiagnosis:
         results = run_diagnosis(kb, [
             "slow_heart_rate", "sustained_fever"
         ])
-        typhoid = next((r for r in results if r.disease == "typhoid"), None)
+        typhoid = by_disease(results).get("typhoid")
         assert typhoid is not None
 
     def test_typhoid_severity_is_medium(self, kb):
@@ -312,11 +415,66 @@ class TestTyphoidDiagnosis:
         results = run_diagnosis(kb, [
             "sustained_fever", "abdominal_pain", "headache"
         ])
-        typhoid = next((r for r in results if r.disease == "typhoid"), None)
+        typhoid = by_disease(results).get("typhoid")
         assert typhoid is not None
         assert typhoid.severity == "medium"
 
 
+# ══════════════════════════════════════════════
+# INFERENCE ENGINE — CACHING & MATCHING TESTS
+# ══════════════════════════════════════════════
+
+class TestInferenceEngine:
+
+    def test_rerun_reflects_working_memory_changes(self, kb):
+        """Cached results must be dropped once the symptoms change."""
+        wm = WorkingMemory()
+        wm.add_symptoms(["cyclical_fever", "chills", "sweating"])
+        engine = InferenceEngine(kb, wm)
+        first = engine.run()
+        assert engine.get_top_diagnosis() is first[0]
+        wm.reset()
+        wm.add_symptoms(["rose_spots", "sustained_fever", "headache"])
+        assert engine.run()[0].disease == "typhoid"
+
+    def test_rerun_sees_direct_symptom_edits(self, kb):
+        """Editing wm.symptoms directly must not be hidden by the cache."""
+        for compiled in (False, True):
+            wm = WorkingMemory()
+            engine = InferenceEngine(kb, wm)
+            if compiled:
+                engine.compile()
+            wm.add_symptom("cough")
+            assert [r.disease for r in engine.run()] == ["common_flu"]
+            wm.symptoms.add("high_fever")
+            assert len(engine.run()) == len(DISEASE_IDS)
+
+    def test_cached_results_survive_caller_mutation(self, kb):
+        """Changing a returned list must not alter the next run()."""
+        wm = WorkingMemory()
+        wm.add_symptoms(["high_fever", "chills", "sweating"])
+        engine = InferenceEngine(kb, wm)
+        first = engine.run()
+        expected = list(first)
+        first.pop(0)
+        assert engine.run() == expected
+        engine.run().clear()
+        assert engine.get_top_diagnoses(len(expected)) == expected
+
+    def test_compiled_engine_matches_generic(self, kb):
+        """A compiled (specialized) engine must give identical results."""
+        wm = WorkingMemory()
+        wm.add_symptoms(["high_fever", "chills", "headache", "nausea", "rash"])
+        assert InferenceEngine(kb, wm).compile().run() == InferenceEngine(kb, wm).run()
+
+    def test_top_diagnoses_match_full_ranking(self, kb):
+        """get_top_diagnoses(k) must equal the first k results of run()."""
+        wm = WorkingMemory()
+        wm.add_symptoms(["high_fever", "chills", "headache", "abdominal_pain", "cough"])
+        top_two = InferenceEngine(kb, wm).get_top_diagnoses(2)
+        assert top_two == InferenceEngine(kb, wm).run()[:2]
+
+
 # ══════════════════════════════════════════════
 # EDGE CASE TESTS
 # ══════════════════════════════════════════════
@@ -351,6 +509,12 @@ class TestEdgeCases:
         total = sum(r.confidence for r in results)
         assert abs(total - 100.0) < 1.0  # allow tiny floating point error
 
+    def test_uncapped_confidences_sum_to_exactly_100(self, kb):
+        """Largest-remainder rounding leaves no 99.9% / 100.1% totals."""
+        results = run_diagnosis(kb, ["high_fever"])
+        assert [r.confidence for r in results] == [33.4, 33.3, 33.3]
+        assert round(sum(r.confidence for r in results), 6) == 100.0
+
     def test_unrelated_symptoms_still_work(self, kb):
         """Unknown/irrelevant symptom keys should not crash the system."""
         results = run_diagnosis(kb, ["fever", "unknown_symptom_xyz"])
@@ -10,10 +10,10 @@ Usage:
 
 import os
 import sys
+from functools import lru_cache
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
@@ -21,21 +21,17 @@ from rich.columns import Columns
 from rich.text import Text
 from rich import box
 
-from core.knowledge_base import KnowledgeBase
+from core.knowledge_base import get_knowledge_base
 from core.working_memory import WorkingMemory
-from core.inference_engine import InferenceEngine
-from core.explanation import ExplanationModule
+from core.inference_engine import InferenceEngine, load_disease_data
 
 console = Console()
 
 # ── Load symptom display labels ──────────────
 
 def load_symptom_labels() -> dict:
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    path = os.path.join(base_dir, "data", "diseases.json")
-    with open(path) as f:
-        data = json.load(f)
-    return data["symptoms_display"]
+    # Shares the engine's parsed-once copy of diseases.json
+    return load_disease_data()["symptoms_display"]
 
 
 # ── Severity colors ──────────────────────────
@@ -47,29 +43,54 @@ SEV_STYLE = {
     "critical" : "bold magenta",
 }
 
+SEV_TEXT = {sev: Text(sev.upper(), style=style) for sev, style in SEV_STYLE.items()}
+
+# Likelihood bars for 0–20 filled cells (one cell per 5%)
+BARS = tuple("█" * i + "░" * (20 - i) for i in range(21))
+
 
 # ── Header ───────────────────────────────────
+# Static renderables, parsed once rather than on every patient.
+
+HEADER_PANEL = Panel.fit(
+    "[bold cyan]🏥  MEDICAL EXPERT SYSTEM[/bold cyan]\n"
+    "[dim]Rule-Based Diagnostic Assistant for Fever-Related Diseases[/dim]\n"
+    "[dim]Diseases: Common Flu | Dengue | Malaria | Typhoid[/dim]",
+    border_style="cyan",
+    padding=(1, 4)
+)
+
+DISCLAIMER = Text.from_markup(
+    "\n[bold yellow]⚠  DISCLAIMER:[/bold yellow] "
+    "[dim]This system is for educational purposes only. "
+    "Always consult a qualified doctor for medical advice.[/dim]\n"
+)
+
+
+# Fixed banners and messages, parsed (markup and highlighting) once at import
+PATIENT_HDR  = console.render_str("[bold cyan]── Patient Information ──────────────────[/bold cyan]")
+SYMPTOMS_HDR = console.render_str("[bold cyan]── Available Symptoms ───────────────────[/bold cyan]")
+MENU_HINT    = console.render_str("[dim]Enter symptom numbers separated by commas (e.g. 1,3,7,12)[/dim]\n")
+SELECTED_HDR = console.render_str("\n[bold cyan]── You selected these symptoms: ─────────[/bold cyan]")
+EMPTY_INPUT  = console.render_str("[red]  Please enter at least one symptom number.[/red]")
+CLEARED      = console.render_str("\n[yellow]  Cleared. Please re-enter your symptoms.[/yellow]\n")
+RUNNING      = console.render_str("\n[bold cyan]  Running diagnosis...[/bold cyan]\n")
+GOODBYE      = console.render_str(
+    "\n[bold cyan]  Thank you for using the Medical Expert System. "
+    "Stay healthy! 🏥[/bold cyan]\n"
+)
+
 
 def print_header():
     console.clear()
-    console.print(Panel.fit(
-        "[bold cyan]🏥  MEDICAL EXPERT SYSTEM[/bold cyan]\n"
-        "[dim]Rule-Based Diagnostic Assistant for Fever-Related Diseases[/dim]\n"
-        "[dim]Diseases: Common Flu | Dengue | Malaria | Typhoid[/dim]",
-        border_style="cyan",
-        padding=(1, 4)
-    ))
-    console.print(
-        "\n[bold yellow]⚠  DISCLAIMER:[/bold yellow] "
-        "[dim]This system is for educational purposes only. "
-        "Always consult a qualified doctor for medical advice.[/dim]\n"
-    )
+    console.print(HEADER_PANEL)
+    console.print(DISCLAIMER)
 
 
 # ── Collect Patient Info ─────────────────────
 
 def collect_patient_info(wm: WorkingMemory):
-    console.print("[bold cyan]── Patient Information ──────────────────[/bold cyan]")
+    console.print(PATIENT_HDR)
 
     name = Prompt.ask("  Patient name", default="Anonymous")
     age  = Prompt.ask("  Age")
@@ -86,24 +107,35 @@ def collect_patient_info(wm: WorkingMemory):
 
 # ── Display Symptom Menu ─────────────────────
 
-def display_symptom_menu(symptom_labels: dict) -> list:
+def display_symptom_menu(symptoms_list: tuple) -> tuple:
     """Show all available symptoms in a simple numbered list."""
-    console.print("[bold cyan]── Available Symptoms ───────────────────[/bold cyan]")
-    console.print("[dim]Enter symptom numbers separated by commas (e.g. 1,3,7,12)[/dim]\n")
-
-    symptoms_list = list(symptom_labels.items())  # [(key, display), ...]
+    console.print(SYMPTOMS_HDR)
+    console.print(MENU_HINT)
 
-    for i, (key, label) in enumerate(symptoms_list, 1):
-        console.print(f"  [dim]{i:>2}.[/dim]  {label}")
+    if console.color_system is None:
+        # No styling possible (pipe, dumb terminal, NO_COLOR): skip Rich entirely
+        console.file.write(_render_menu(symptoms_list, plain=True) + "\n")
+    else:
+        console.print(_render_menu(symptoms_list))
 
     console.print()
     return symptoms_list
 
 
+@lru_cache(maxsize=4)
+def _render_menu(symptoms_list: tuple, plain: bool = False) -> str:
+    """Menu text, built once and printed in a single call per patient."""
+    fmt = "  {:>2}.  {}" if plain else "  [dim]{:>2}.[/dim]  {}"
+    return "\n".join(
+        fmt.format(i, label)
+        for i, (key, label) in enumerate(symptoms_list, 1)
+    )
+
+
 # ── Collect Symptoms ─────────────────────────
 
-def collect_symptoms(wm: WorkingMemory, symptom_labels: dict):
-    symptoms_list = display_symptom_menu(symptom_labels)
+def collect_symptoms(wm: WorkingMemory, symptoms_list: tuple):
+    display_symptom_menu(symptoms_list)
 
     while True:
         raw = Prompt.ask(
@@ -111,7 +143,7 @@ def collect_symptoms(wm: WorkingMemory, symptom_labels: dict):
         ).strip()
 
         if not raw:
-            console.print("[red]  Please enter at least one symptom number.[/red]")
+            console.print(EMPTY_INPUT)
             continue
 
         selected_indices = []
@@ -133,15 +165,13 @@ def collect_symptoms(wm: WorkingMemory, symptom_labels: dict):
         if not valid:
             continue
 
-        # Add selected symptoms to working memory
-        selected_symptoms = []
-        for idx in selected_indices:
-            key, label = symptoms_list[idx]
-            wm.add_symptom(key)
-            selected_symptoms.append(label)
+        # Add selected symptoms to working memory in one batch
+        selected = [symptoms_list[idx] for idx in selected_indices]
+        wm.add_symptoms(key for key, label in selected)
+        selected_symptoms = [label for key, label in selected]
 
         # Confirm selection
-        console.print("\n[bold cyan]── You selected these symptoms: ─────────[/bold cyan]")
+        console.print(SELECTED_HDR)
         for s in selected_symptoms:
             console.print(f"  [green]✓[/green]  {s}")
 
@@ -153,7 +183,7 @@ def collect_symptoms(wm: WorkingMemory, symptom_labels: dict):
         else:
             # Let them re-enter
             wm.clear_symptoms()
-            console.print("\n[yellow]  Cleared. Please re-enter your symptoms.[/yellow]\n")
+            console.print(CLEARED)
 
 
 # ── Display Results ──────────────────────────
@@ -169,8 +199,7 @@ def display_results(results: list, wm: WorkingMemory):
         ))
         return
 
-    console.print()
-    console.print(Panel(
+    patient_panel = Panel(
         f"[bold cyan]Diagnosis Results for: "
         f"[white]{wm.get_patient_info('name', 'Patient')}[/white][/bold cyan]\n"
         f"[dim]Age: {wm.get_patient_info('age', 'N/A')}  |  "
@@ -178,7 +207,7 @@ def display_results(results: list, wm: WorkingMemory):
         f"Duration: {wm.get_patient_info('illness_duration_days', 'N/A')} day(s)[/dim]",
         border_style="cyan",
         title="🏥 Patient Report"
-    ))
+    )
 
     # ── Results table ────────────────────────
     table = Table(
@@ -195,28 +224,20 @@ def display_results(results: list, wm: WorkingMemory):
     table.add_column("Severity",    width=12)
 
     for i, r in enumerate(results, 1):
-        rank_str = f"#{i}"
-        bar_len  = int(r.confidence / 5)
-        bar      = "█" * bar_len + "░" * (20 - bar_len)
-        sev_style = SEV_STYLE.get(r.severity, "white")
-        conf_str  = f"{r.confidence:.1f}%"
-
+        sev_text = SEV_TEXT.get(r.severity) or Text(r.severity.upper(), style="white")
         table.add_row(
-            rank_str,
+            f"#{i}",
             r.display_name,
-            conf_str,
-            bar,
-            Text(r.severity.upper(), style=sev_style)
+            f"{r.confidence:.1f}%",
+            BARS[min(int(r.confidence / 5), 20)],
+            sev_text
         )
 
-    console.print(table)
-
     # ── Top diagnosis detail ─────────────────
     top = results[0]
     sev_style = SEV_STYLE.get(top.severity, "white")
 
-    console.print()
-    console.print(Panel(
+    top_panel = Panel(
         f"[bold white]{top.display_name}[/bold white]  "
         f"[cyan]({top.confidence:.1f}% confidence)[/cyan]\n\n"
         f"[dim]{top.description}[/dim]\n\n"
@@ -226,7 +247,10 @@ def display_results(results: list, wm: WorkingMemory):
         border_style="green",
         title="[bold green]Top Diagnosis[/bold green]",
         padding=(1, 2)
-    ))
+    )
+
+    # One render pass and write for the whole results screen
+    console.print(Group(Text(), patient_panel, table, Text(), top_panel))
 
     # ── Ask to show explanation ──────────────
     console.print()
@@ -242,6 +266,7 @@ def display_results(results: list, wm: WorkingMemory):
 # ── Display Explanation ──────────────────────
 
 def display_explanation(result, wm: WorkingMemory):
+    from core.explanation import ExplanationModule   # only if the user asks
     console.print()
     console.print(Panel(
         f"[bold cyan]Why was [white]{result.display_name}[/white] diagnosed?[/bold cyan]",
@@ -276,23 +301,25 @@ def display_explanation(result, wm: WorkingMemory):
 # ── Main Loop ────────────────────────────────
 
 def main():
-    symptom_labels = load_symptom_labels()
-    kb = KnowledgeBase()
+    symptoms_list = tuple(load_symptom_labels().items())   # ((key, display), ...)
+    wm = WorkingMemory()              # reset and reused for every patient
+    engine = None                     # built on the first diagnosis
 
     while True:
         print_header()
 
-        wm = WorkingMemory()
+        wm.reset()
 
         # Step 1: Patient info
         collect_patient_info(wm)
 
         # Step 2: Collect symptoms
-        collect_symptoms(wm, symptom_labels)
+        collect_symptoms(wm, symptoms_list)
 
         # Step 3: Run inference
-        console.print("\n[bold cyan]  Running diagnosis...[/bold cyan]\n")
-        engine = InferenceEngine(kb, wm)
+        console.print(RUNNING)
+        if engine is None:
+            engine = InferenceEngine(get_knowledge_base(), wm)
         results = engine.run()
 
         # Step 4: Display results
@@ -302,10 +329,7 @@ def main():
         console.print()
         again = Confirm.ask("  Diagnose another patient?", default=False)
         if not again:
-            console.print(
-                "\n[bold cyan]  Thank you for using the Medical Expert System. "
-                "Stay healthy! 🏥[/bold cyan]\n"
-            )
+            console.print(GOODBYE)
             break
 
 